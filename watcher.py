@@ -12,9 +12,69 @@ Controls:
 """
 
 import cv2
+import math
+import numpy as np
 import os
+import threading
 import time
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+# OpenCV's T-API runs cvtColor/matchTemplate/minMaxLoc on the GPU when the
+# inputs are UMat; probe once at import whether an OpenCL device is usable.
+HAVE_OPENCL = False
+if cv2.ocl.haveOpenCL():
+    cv2.ocl.setUseOpenCL(True)
+    HAVE_OPENCL = cv2.ocl.useOpenCL()
+
+
+if HAVE_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _ncc_scores(frame, tmpl_zero_mean, tmpl_norm):
+        """
+        Normalized cross-correlation of a zero-mean float32 template against
+        a float32 frame, equivalent to cv2.TM_CCOEFF_NORMED. Window sums come
+        from integral images so the local mean/stdev are O(1) per position,
+        and the template statistics are computed once in init() instead of
+        being rederived on every call.
+        """
+        fh, fw = frame.shape
+        th, tw = tmpl_zero_mean.shape
+        oh, ow = fh - th + 1, fw - tw + 1
+        area = th * tw
+
+        S = np.zeros((fh + 1, fw + 1), np.float64)
+        S2 = np.zeros((fh + 1, fw + 1), np.float64)
+        for i in range(fh):
+            row = 0.0
+            row2 = 0.0
+            for j in range(fw):
+                v = frame[i, j]
+                row += v
+                row2 += v * v
+                S[i + 1, j + 1] = S[i, j + 1] + row
+                S2[i + 1, j + 1] = S2[i, j + 1] + row2
+
+        out = np.empty((oh, ow), np.float32)
+        for i in prange(oh):
+            for j in range(ow):
+                cross = 0.0
+                for u in range(th):
+                    for v in range(tw):
+                        cross += tmpl_zero_mean[u, v] * frame[i + u, j + v]
+                win_sum = S[i + th, j + tw] - S[i, j + tw] - S[i + th, j] + S[i, j]
+                win_sq = S2[i + th, j + tw] - S2[i, j + tw] - S2[i + th, j] + S2[i, j]
+                var = win_sq - win_sum * win_sum / area
+                if var <= 1e-6:
+                    out[i, j] = 0.0
+                else:
+                    out[i, j] = cross / (tmpl_norm * np.sqrt(var))
+        return out
 
 
 class TemplateTracker:
@@ -23,28 +83,282 @@ class TemplateTracker:
     Used automatically when opencv-contrib-python is not installed.
     """
     CONFIDENCE_THRESHOLD = 0.45
+    # TM_SQDIFF_NORMED is a dissimilarity: near 0 at the true location but
+    # typically 0.2+ over unrelated texture, so it needs its own cutoff — a
+    # flipped CONFIDENCE_THRESHOLD would accept almost any background patch
+    # and mask a disappeared object.
+    SQDIFF_MATCH_THRESHOLD = 0.12
+    # Mean absolute gray-level difference under which the scene around the
+    # last match is considered unchanged and matching is skipped entirely.
+    GATE_MAD_THRESHOLD = 5.0
 
     def __init__(self):
-        self.template = None
         self.template_gray = None
+        self.last_loc = None
+        self._tmpl_zero_mean = None
+        self._tmpl_norm = 0.0
+        self._template_umat = None
+        self._gray_buf = None
+        self._thumb_template = None
+        self._thumb_size = None
 
     def init(self, frame, bbox):
         x, y, w, h = [int(v) for v in bbox]
-        self.template = frame[y:y + h, x:x + w].copy()
-        self.template_gray = cv2.cvtColor(self.template, cv2.COLOR_BGR2GRAY)
+        # cvtColor already allocates a fresh array, so the grayscale template
+        # is detached from the frame buffer without an extra BGR copy.
+        self.template_gray = cv2.cvtColor(frame[y:y + h, x:x + w],
+                                          cv2.COLOR_BGR2GRAY)
+        self.last_loc = (x, y)
+        # 8x-downsampled thumbnail used by the early-exit gate in update().
+        self._thumb_size = (max(1, w // 8), max(1, h // 8))
+        self._thumb_template = cv2.resize(self.template_gray, self._thumb_size,
+                                          interpolation=cv2.INTER_AREA)
+        if HAVE_NUMBA and USE_NUMBA_NCC:
+            # Template statistics never change between updates, so the
+            # zero-mean template and its norm are computed once here.
+            t = self.template_gray.astype(np.float32)
+            t -= t.mean()
+            self._tmpl_zero_mean = t
+            self._tmpl_norm = float(np.sqrt((t * t).sum()))
+        elif HAVE_OPENCL:
+            self._template_umat = cv2.UMat(self.template_gray)
+            # Warm up the OpenCL kernels here so their JIT compilation does
+            # not stall the first tracked frame.
+            cv2.matchTemplate(self._template_umat, self._template_umat,
+                              cv2.TM_SQDIFF_NORMED)
+
+    def _match(self, search_gray):
+        """
+        Find the best template match in search_gray.
+        Returns (accepted, top_left); each scoring method applies its own
+        threshold since NCC similarity and SQDIFF dissimilarity live on
+        different scales.
+        """
+        if HAVE_NUMBA and USE_NUMBA_NCC and self._tmpl_norm > 1e-6:
+            scores = _ncc_scores(search_gray.astype(np.float32),
+                                 self._tmpl_zero_mean, self._tmpl_norm)
+            _, max_val, _, max_loc = cv2.minMaxLoc(scores)
+            return max_val >= self.CONFIDENCE_THRESHOLD, max_loc
+        # TM_SQDIFF_NORMED skips the local-mean subtraction that
+        # TM_CCOEFF_NORMED performs over every search window (~half the
+        # FLOPs), and OpenCV switches this path to an O(N log N) DFT once
+        # the template is >= 18 px. The best match is the *minimum*.
+        template = (self._template_umat if self._template_umat is not None
+                    else self.template_gray)
+        result = cv2.matchTemplate(search_gray, template,
+                                   cv2.TM_SQDIFF_NORMED)
+        min_val, _, min_loc, _ = cv2.minMaxLoc(result)
+        return min_val <= self.SQDIFF_MATCH_THRESHOLD, min_loc
 
     def update(self, frame):
         if self.template_gray is None:
             return False, None
-        frame_gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        result = cv2.matchTemplate(frame_gray, self.template_gray, cv2.TM_CCOEFF_NORMED)
-        _, max_val, _, max_loc = cv2.minMaxLoc(result)
-        if max_val < self.CONFIDENCE_THRESHOLD:
-            return False, None
         h, w = self.template_gray.shape[:2]
+        fh, fw = frame.shape[:2]
+
+        # Early exit for the common case of a parked, unmoved object: if an
+        # 8x-downsampled view of the last known position still matches the
+        # template thumbnail, skip template matching for this frame.
+        if self.last_loc is not None:
+            lx, ly = self.last_loc
+            if lx + w <= fw and ly + h <= fh:
+                patch = cv2.cvtColor(frame[ly:ly + h, lx:lx + w],
+                                     cv2.COLOR_BGR2GRAY)
+                thumb = cv2.resize(patch, self._thumb_size,
+                                   interpolation=cv2.INTER_AREA)
+                err = (cv2.norm(thumb, self._thumb_template, cv2.NORM_L1)
+                       / (self._thumb_size[0] * self._thumb_size[1]))
+                if err < self.GATE_MAD_THRESHOLD:
+                    return True, (lx, ly, w, h)
+
+        use_ocl = self._template_umat is not None
+        if use_ocl:
+            # Keep the whole pipeline on the GPU: cvtColor, the window crop
+            # and matchTemplate all stay UMat until minMaxLoc pulls scalars.
+            frame_gray = cv2.cvtColor(cv2.UMat(frame), cv2.COLOR_BGR2GRAY)
+        else:
+            # Convert into a buffer reused across frames; a fresh W*H array
+            # every update is pure allocator churn for memory-bound code.
+            if (self._gray_buf is None
+                    or self._gray_buf.shape != frame.shape[:2]):
+                self._gray_buf = np.empty(frame.shape[:2], np.uint8)
+            frame_gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY,
+                                      dst=self._gray_buf)
+
+        # A parked object barely moves between frames, so search a padded
+        # window around the last match first; a full-frame search is only
+        # needed when that window loses the object.
+        if self.last_loc is not None:
+            margin = max(w, h) + MOVE_THRESHOLD_PX
+            lx, ly = self.last_loc
+            x0 = max(0, lx - margin)
+            y0 = max(0, ly - margin)
+            x1 = min(fw, lx + w + margin)
+            y1 = min(fh, ly + h + margin)
+            if y1 - y0 >= h and x1 - x0 >= w:
+                if use_ocl:
+                    window = cv2.UMat(frame_gray, [y0, y1], [x0, x1])
+                else:
+                    window = frame_gray[y0:y1, x0:x1]
+                accepted, max_loc = self._match(window)
+                if accepted:
+                    x, y = max_loc[0] + x0, max_loc[1] + y0
+                    self.last_loc = (x, y)
+                    return True, (x, y, w, h)
+
+        accepted, max_loc = self._match(frame_gray)
+        if not accepted:
+            self.last_loc = None
+            return False, None
+        self.last_loc = max_loc
         return True, (max_loc[0], max_loc[1], w, h)
 
 
+class MouseState:
+    """
+    Cursor position and pending-click flag shared with the mouse callback.
+    __slots__ keeps attribute access at C level; mouse-move events can fire
+    thousands of times a second, so per-event dict lookups add up.
+    """
+    __slots__ = ("x", "y", "clicked")
+
+    def __init__(self):
+        self.x = 0
+        self.y = 0
+        self.clicked = False
+
+
+class FrameGrabber:
+    """
+    Reads frames from a VideoCapture on a background thread, keeping only
+    the newest one. The main loop then never waits on the camera driver and
+    stale frames are dropped instead of queueing up while the tracker works.
+    """
+
+    def __init__(self, cap):
+        self.cap = cap
+        self._lock = threading.Lock()
+        self._latest = None
+        self._seq = 0
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _loop(self):
+        while self._running:
+            ret, frame = self.cap.read()
+            if not ret:
+                self._running = False
+                break
+            with self._lock:
+                self._latest = frame
+                self._seq += 1
+
+    def read(self, timeout=5.0):
+        """Return the newest frame, or None if the feed is lost / timed out."""
+        frame, _ = self.read_new(-1, timeout)
+        return frame
+
+    def read_new(self, last_seq, timeout=5.0):
+        """
+        Return (frame, seq) for the first frame newer than last_seq, or
+        (None, last_seq) if the feed is lost / timed out. Lets consumers
+        wait for fresh input instead of re-processing the same frame.
+        """
+        deadline = time.time() + timeout
+        while True:
+            with self._lock:
+                running, frame, seq = self._running, self._latest, self._seq
+            if not running:
+                # Feed lost (or grabber stopped): never hand out the cached
+                # last frame, so consumers see the loss instead of freezing
+                # on a stale image.
+                return None, last_seq
+            if frame is not None and seq != last_seq:
+                # Each consumer gets its own copy: the main loop draws UI
+                # onto its frame while the tracker thread reads another, so
+                # sharing the stored buffer would race and leak overlays
+                # into the matcher (and into repeat reads of one frame).
+                return frame.copy(), seq
+            if time.time() >= deadline:
+                return None, last_seq
+            time.sleep(0.002)
+
+    def is_running(self):
+        """Whether the capture thread is still delivering frames."""
+        return self._running
+
+    def stop(self):
+        self._running = False
+        self._thread.join(timeout=1.0)
+
+
+class TrackerWorker:
+    """
+    Runs tracker.update on its own thread so a slow tracker (CSRT takes
+    20-60 ms/frame on a mid-range laptop) never blocks capture or the UI.
+    The main loop renders the most recently published result; the bbox may
+    lag the displayed frame by a frame or two, which is acceptable for a
+    parked-object watch.
+    """
+
+    def __init__(self, grabber):
+        self.grabber = grabber
+        self._lock = threading.Lock()
+        self._tracker = None
+        self._result = None
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def set_tracker(self, tracker):
+        """Swap in a freshly initialized tracker (initial selection or 'r')."""
+        with self._lock:
+            self._tracker = tracker
+            self._result = None
+
+    def _loop(self):
+        last_seq = -1
+        while self._running:
+            with self._lock:
+                tracker = self._tracker
+            if tracker is None:
+                time.sleep(0.01)
+                continue
+            frame, last_seq = self.grabber.read_new(last_seq)
+            if frame is None:
+                if not self.grabber.is_running():
+                    break
+                # Transient frame drought (USB stall, suspend/resume):
+                # publish a detection failure so the alert path surfaces
+                # the stall, then keep retrying instead of dying.
+                with self._lock:
+                    if self._tracker is tracker:
+                        self._result = (False, None)
+                continue
+            success, bbox = tracker.update(downscale(frame))
+            if success:
+                bbox = scale_bbox(bbox, 1 / TRACK_SCALE)
+            with self._lock:
+                if self._tracker is tracker:  # drop results from a replaced tracker
+                    self._result = (success, bbox)
+
+    def result(self):
+        """Return the latest (success, bbox), or None before the first update."""
+        with self._lock:
+            return self._result
+
+    def stop(self):
+        self._running = False
+        self._thread.join(timeout=1.0)
+
+
 def create_tracker():
     """Create a CSRT tracker if contrib is available, else fall back to template matching."""
     for factory in (
@@ -67,7 +381,15 @@ def create_tracker():
 WEBCAM_INDEX = 0           # Change if your webcam isn't device 0
 ALERT_COOLDOWN_SEC = 5     # Minimum seconds between consecutive alerts
 MOVE_THRESHOLD_PX = 40     # How many pixels the centre can drift before alert
+MOVE_THRESHOLD_PX_SQ = MOVE_THRESHOLD_PX * MOVE_THRESHOLD_PX
 SNAPSHOT_DIR = "snapshots" # Folder where alert images are saved
+TRACK_SCALE = 0.5          # Tracker runs on frames downscaled by this factor;
+                           # display and snapshots keep the full resolution
+UI_MAX_FPS = 30            # Cap on imshow/redraw rate; saves GUI pump work
+UI_FRAME_SEC = 1 / UI_MAX_FPS
+USE_NUMBA_NCC = False      # Opt-in: the brute-force Numba NCC only pays off
+                           # for tiny search windows; OpenCV's DFT-backed
+                           # matchTemplate wins at webcam sizes
 
 # ── UI / button styling ────────────────────────────────────────────────────────
 
@@ -82,6 +404,17 @@ UI_FONT        = cv2.FONT_HERSHEY_SIMPLEX
 UI_SCALE       = 0.6
 UI_THICK       = 1
 
+# Button labels and font parameters are constants, so their text metrics can
+# be measured once at import time instead of per frame.
+BTN_SPECS = [
+    ("reselect", "Reselect  [R]"),
+    ("quit",     "Quit  [Q]"),
+]
+BTN_METRICS = {
+    name: cv2.getTextSize(label, UI_FONT, UI_SCALE, UI_THICK)[0]
+    for name, label in BTN_SPECS
+}
+
 # ─────────────────────────────────────────────────────────────────────────────
 
 
@@ -90,8 +423,16 @@ def centre(bbox):
     return (x + w // 2, y + h // 2)
 
 
-def distance(p1, p2):
-    return ((p1[0] - p2[0]) ** 2 + (p1[1] - p2[1]) ** 2) ** 0.5
+def scale_bbox(bbox, factor):
+    # Rounded to ints: the new-style cv2.TrackerCSRT.init binding rejects
+    # float bounding boxes, and every downstream consumer wants pixels.
+    return tuple(int(round(v * factor)) for v in bbox)
+
+
+def downscale(frame):
+    """Shrink a frame by TRACK_SCALE for the tracker's benefit."""
+    return cv2.resize(frame, None, fx=TRACK_SCALE, fy=TRACK_SCALE,
+                      interpolation=cv2.INTER_AREA)
 
 
 def draw_text_with_bg(frame, text, pos,
@@ -108,73 +449,141 @@ def draw_text_with_bg(frame, text, pos,
                 color, thickness, cv2.LINE_AA)
 
 
-def draw_buttons(frame, mouse_x, mouse_y):
-    """
-    Draw clickable buttons at the bottom-right of the frame.
-    Returns a dict mapping button name -> (x, y, w, h).
-    """
-    h, w = frame.shape[:2]
-    specs = [
-        ("reselect", "Reselect  [R]"),
-        ("quit",     "Quit  [Q]"),
-    ]
+# Button layout only depends on the frame size, so it is computed once per
+# (width, height) and reused for both rendering and click hit-testing.
+_layout_cache = {}
+
+# Buttons look identical every frame apart from hover state, so each
+# (button, hovered) tile is rasterized once and blitted as a whole.
+_sprite_cache = {}
+
+
+def button_sprite(name, label, hovered):
+    """Return the pre-rendered BGR tile for one button in one hover state."""
+    key = (name, hovered)
+    sprite = _sprite_cache.get(key)
+    if sprite is None:
+        tw, th = BTN_METRICS[name]
+        bw = tw + BTN_PAD_X * 2
+        bg = BTN_HOVER_BG if hovered else BTN_BG
+        sprite = np.full((BTN_H, bw, 3), bg, np.uint8)
+        cv2.rectangle(sprite, (0, 0), (bw - 1, BTN_H - 1), BTN_BORDER, 1)
+        tx = (bw - tw) // 2
+        ty = (BTN_H + th) // 2
+        cv2.putText(sprite, label, (tx, ty), UI_FONT, UI_SCALE,
+                    BTN_TEXT_COLOR, UI_THICK, cv2.LINE_AA)
+        _sprite_cache[key] = sprite
+    return sprite
+
+
+def button_layout(w, h):
+    """Return a dict mapping button name -> (x, y, w, h) for a w*h frame."""
+    rects = _layout_cache.get((w, h))
+    if rects is not None:
+        return rects
 
     # Calculate rects right-to-left so order is left=Reselect, right=Quit
     rects = {}
     x_cursor = w - BTN_MARGIN
-    for name, label in reversed(specs):
-        (tw, _), _ = cv2.getTextSize(label, UI_FONT, UI_SCALE, UI_THICK)
+    for name, label in reversed(BTN_SPECS):
+        tw, _ = BTN_METRICS[name]
         bw = tw + BTN_PAD_X * 2
         bx = x_cursor - bw
         by = h - BTN_H - BTN_MARGIN
         x_cursor = bx - BTN_MARGIN
         rects[name] = (bx, by, bw, BTN_H)
 
-    for name, label in specs:
+    _layout_cache[(w, h)] = rects
+    return rects
+
+
+def draw_buttons(frame, mouse_x, mouse_y):
+    """
+    Draw clickable buttons at the bottom-right of the frame.
+    Returns a dict mapping button name -> (x, y, w, h).
+    """
+    h, w = frame.shape[:2]
+    rects = button_layout(w, h)
+
+    for name, label in BTN_SPECS:
         bx, by, bw, bh = rects[name]
         hovered = bx <= mouse_x <= bx + bw and by <= mouse_y <= by + bh
-        bg = BTN_HOVER_BG if hovered else BTN_BG
-        cv2.rectangle(frame, (bx, by), (bx + bw, by + bh), bg, -1)
-        cv2.rectangle(frame, (bx, by), (bx + bw, by + bh), BTN_BORDER, 1)
-        (tw, th), _ = cv2.getTextSize(label, UI_FONT, UI_SCALE, UI_THICK)
-        tx = bx + (bw - tw) // 2
-        ty = by + (bh + th) // 2
-        cv2.putText(frame, label, (tx, ty), UI_FONT, UI_SCALE,
-                    BTN_TEXT_COLOR, UI_THICK, cv2.LINE_AA)
+        frame[by:by + bh, bx:bx + bw] = button_sprite(name, label, hovered)
 
     return rects
 
 
+# The red border and the "ALERT: " prefix never change for a given frame
+# size; only the reason text varies. Pre-render the static parts once.
+_alert_cache = {}
+
+
+def _alert_assets(w, h):
+    """Return (border, border_mask, prefix_sprite, prefix_origin, reason_x)."""
+    assets = _alert_cache.get((w, h))
+    if assets is None:
+        border = np.zeros((h, w, 3), np.uint8)
+        cv2.rectangle(border, (0, 0), (w - 1, h - 1), (0, 0, 255), 6)
+        mask = np.zeros((h, w), np.uint8)
+        cv2.rectangle(mask, (0, 0), (w - 1, h - 1), 255, 6)
+
+        # Prefix tile laid out exactly as draw_text_with_bg would place it
+        # for text at (10, h - 55) with padding 6.
+        (tw, th), baseline = cv2.getTextSize("ALERT: ", UI_FONT, 0.9, 2)
+        pad = 6
+        sprite = np.zeros((th + baseline + 2 * pad, tw + pad, 3), np.uint8)
+        cv2.putText(sprite, "ALERT: ", (pad, pad + th), UI_FONT, 0.9,
+                    (0, 0, 255), 2, cv2.LINE_AA)
+        assets = (border, mask, sprite, (10 - pad, h - 55 - th - pad), 10 + tw)
+        _alert_cache[(w, h)] = assets
+    return assets
+
+
 def draw_alert_overlay(frame, message):
     """Draw a red border and alert message with a solid black background."""
     h, w = frame.shape[:2]
-    cv2.rectangle(frame, (0, 0), (w - 1, h - 1), (0, 0, 255), 6)
-    draw_text_with_bg(frame, f"ALERT: {message}", (10, h - 55),
+    border, mask, prefix, (px, py), reason_x = _alert_assets(w, h)
+    cv2.copyTo(border, mask, frame)
+    sh, sw = prefix.shape[:2]
+    frame[py:py + sh, px:px + sw] = prefix
+    draw_text_with_bg(frame, message, (reason_x, h - 55),
                       font_scale=0.9, color=(0, 0, 255), bg=(0, 0, 0),
                       thickness=2, padding=6)
 
 
-def save_snapshot(frame, reason):
-    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
-    ts = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    filename = os.path.join(SNAPSHOT_DIR, f"alert_{ts}.jpg")
+# JPEG encoding plus the disk write can stall the loop for 100+ ms on slow
+# storage, so snapshots are handed to a single background worker.
+_snap_pool = ThreadPoolExecutor(max_workers=1)
+
+
+def _write_snapshot(frame, filename, ts):
     cv2.imwrite(filename, frame)
     print(f"[{ts}] Snapshot saved: {filename}")
+
+
+def save_snapshot(frame, reason):
+    # time.strftime formats localtime directly, without building a datetime
+    # object first — keeps the alert path allocation-free.
+    ts = time.strftime("%Y-%m-%d_%H-%M-%S")
+    filename = os.path.join(SNAPSHOT_DIR, f"alert_{ts}.jpg")
+    # The main loop draws on `frame` next iteration, so the worker gets its
+    # own copy.
+    _snap_pool.submit(_write_snapshot, frame.copy(), filename, ts)
     return filename
 
 
 def log_alert(reason):
-    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    ts = time.strftime("%Y-%m-%d %H:%M:%S")
     print(f"[{ts}] *** ALERT *** {reason}")
 
 
-def select_roi(cap):
+def select_roi(grabber):
     """Let the user draw a bounding box. Returns (x, y, w, h) or None."""
     print("\nDraw a box around your bicycle, then press SPACE or ENTER to confirm.")
     print("Press 'c' to cancel.\n")
 
-    ret, frame = cap.read()
-    if not ret:
+    frame = grabber.read()
+    if frame is None:
         print("ERROR: Could not read from webcam.")
         return None
 
@@ -190,7 +599,14 @@ def select_roi(cap):
 
 
 def main():
+    # Webcam-sized kernels are cache-bound: one OpenCV worker per *logical*
+    # core (the default) just thrashes shared cache lines on hyperthreaded
+    # CPUs. Pin to the physical-core count instead.
+    cv2.setNumThreads(max(1, (os.cpu_count() or 2) // 2))
+    cv2.setUseOptimized(True)
+
     print("=== Bicycle Watcher ===")
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
     print(f"Snapshots will be saved to: ./{SNAPSHOT_DIR}/")
     print("Press 'r' / click Reselect to re-select the region, 'q' / Quit to quit.\n")
 
@@ -199,9 +615,18 @@ def main():
         print(f"ERROR: Cannot open webcam (index {WEBCAM_INDEX}).")
         return
 
+    # Keep the driver buffer at a single frame so each read() returns the
+    # freshest image instead of one queued several frames ago.
+    if not cap.set(cv2.CAP_PROP_BUFFERSIZE, 1):
+        print("WARNING: Webcam backend ignored CAP_PROP_BUFFERSIZE; "
+              "frames may lag slightly behind real time.")
+
+    grabber = FrameGrabber(cap).start()
+
     # ── Initial ROI selection ─────────────────────────────────────────────────
-    bbox = select_roi(cap)
+    bbox = select_roi(grabber)
     if bbox is None:
+        grabber.stop()
         cap.release()
         return
 
@@ -209,8 +634,11 @@ def main():
     print(f"Tracking started. Original centre: {original_centre}")
 
     tracker = create_tracker()
-    ret, frame = cap.read()
-    tracker.init(frame, bbox)
+    frame = grabber.read()
+    tracker.init(downscale(frame), scale_bbox(bbox, TRACK_SCALE))
+
+    worker = TrackerWorker(grabber).start()
+    worker.set_tracker(tracker)
 
     last_alert_time = 0
 
@@ -218,24 +646,36 @@ def main():
     WIN = "Bicycle Watcher"
     cv2.namedWindow(WIN)
 
-    mouse_state = {"x": 0, "y": 0, "clicked": False}
+    mouse_state = MouseState()
 
     def on_mouse(event, x, y, flags, param):
-        mouse_state["x"] = x
-        mouse_state["y"] = y
+        mouse_state.x = x
+        mouse_state.y = y
         if event == cv2.EVENT_LBUTTONDOWN:
-            mouse_state["clicked"] = True
+            mouse_state.clicked = True
 
     cv2.setMouseCallback(WIN, on_mouse)
 
+    # Buttons only change with mouse position or frame size, so they are
+    # rendered once onto a cached overlay and blitted each frame instead of
+    # being redrawn from scratch.
+    ui_key = None
+    ui_overlay = None
+    ui_mask = None
+    button_rects = {}
+    last_show = time.monotonic() - UI_FRAME_SEC  # show the first frame at once
+
     # ── Main loop ─────────────────────────────────────────────────────────────
     while True:
-        ret, frame = cap.read()
-        if not ret:
+        frame = grabber.read()
+        if frame is None:
             print("ERROR: Lost webcam feed.")
             break
 
-        success, bbox = tracker.update(frame)
+        # Render the most recent result published by the tracker thread;
+        # until the first update lands, fall back to the selected bbox.
+        result = worker.result()
+        success, bbox = result if result is not None else (True, bbox)
         now = time.time()
         alert_active = False
         alert_reason = ""
@@ -245,11 +685,14 @@ def main():
             alert_reason = "Bicycle not detected!"
         else:
             current_centre = centre([int(v) for v in bbox])
-            drift = distance(original_centre, current_centre)
+            # Compare squared distances so the common no-alert path skips
+            # the sqrt entirely; hypot only runs when building the message.
+            dx = current_centre[0] - original_centre[0]
+            dy = current_centre[1] - original_centre[1]
 
-            if drift > MOVE_THRESHOLD_PX:
+            if dx * dx + dy * dy > MOVE_THRESHOLD_PX_SQ:
                 alert_active = True
-                alert_reason = f"Bicycle moved! ({int(drift)}px drift)"
+                alert_reason = f"Bicycle moved! ({int(math.hypot(dx, dy))}px drift)"
             else:
                 x, y, w, h = [int(v) for v in bbox]
                 cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
@@ -265,35 +708,60 @@ def main():
                 save_snapshot(frame, alert_reason)
                 last_alert_time = now
 
-        # Draw buttons and get their rects for click-testing
-        button_rects = draw_buttons(frame, mouse_state["x"], mouse_state["y"])
-
-        cv2.imshow(WIN, frame)
+        # Composite the UI and refresh the window at most UI_MAX_FPS times a
+        # second; pumping imshow faster than the display refresh is wasted
+        # work. time.monotonic() is immune to wall-clock jumps.
+        mono = time.monotonic()
+        if mono - last_show >= UI_FRAME_SEC:
+            last_show = mono
+
+            # Blit the cached buttons, regenerating the overlay only when
+            # the mouse has moved or the frame size changed.
+            fh, fw = frame.shape[:2]
+            state_key = (fw, fh, mouse_state.x, mouse_state.y)
+            if state_key != ui_key:
+                ui_key = state_key
+                ui_overlay = np.zeros((fh, fw, 3), np.uint8)
+                button_rects = draw_buttons(ui_overlay,
+                                            mouse_state.x, mouse_state.y)
+                ui_mask = np.zeros((fh, fw), np.uint8)
+                for bx, by, bw, bh in button_rects.values():
+                    ui_mask[by:by + bh, bx:bx + bw] = 255
+            cv2.copyTo(ui_overlay, ui_mask, frame)
+
+            cv2.imshow(WIN, frame)
 
         # Resolve a mouse click into an action name
         clicked_action = None
-        if mouse_state["clicked"]:
-            mouse_state["clicked"] = False
-            mx, my = mouse_state["x"], mouse_state["y"]
+        if mouse_state.clicked:
+            mouse_state.clicked = False
+            mx, my = mouse_state.x, mouse_state.y
             for name, (bx, by, bw, bh) in button_rects.items():
                 if bx <= mx <= bx + bw and by <= my <= by + bh:
                     clicked_action = name
 
-        key = cv2.waitKey(1) & 0xFF
+        # Sleep out the remainder of the UI frame period inside waitKey so
+        # the loop wakes up roughly when the next refresh is due.
+        wait_ms = max(1, int((UI_FRAME_SEC - (time.monotonic() - last_show)) * 1000))
+        key = cv2.waitKey(wait_ms) & 0xFF
 
         if key == ord('q') or clicked_action == "quit":
             print("Quitting.")
             break
         elif key == ord('r') or clicked_action == "reselect":
-            bbox = select_roi(cap)
+            bbox = select_roi(grabber)
             if bbox is not None:
                 original_centre = centre(bbox)
                 tracker = create_tracker()
-                ret, frame = cap.read()
-                tracker.init(frame, bbox)
+                frame = grabber.read()
+                tracker.init(downscale(frame), scale_bbox(bbox, TRACK_SCALE))
+                worker.set_tracker(tracker)
                 print(f"Re-tracking from new position: {original_centre}")
                 cv2.setMouseCallback(WIN, on_mouse)  # re-attach after ROI window closes
 
+    _snap_pool.shutdown(wait=True)  # flush any snapshot still being written
+    worker.stop()
+    grabber.stop()
     cap.release()
     cv2.destroyAllWindows()
 